@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+지문 계산 속도 및 판정 일치도 비교 스크립트
+- 같은 파일들에 대해 프레임 해시(get_frame_hashes)와 오디오 지문(get_audio_fingerprint)의
+  파일당 소요 시간을 측정
+- 모든 파일 쌍에 대해 오디오 판정이 프레임 해시 판정과 얼마나 일치하는지 집계
+  (AUDIO_THRESHOLD 검증용 - 프레임으로는 중복인데 오디오가 거부하는 쌍은 --audio 사용 시 놓치는 중복)
+
+사용법: python benchmark_fingerprints.py [검색경로] [파일 수]
+"""
+
+import sys
+import time
+from itertools import combinations
+
+from find_duplicate_videos import (
+    AUDIO_THRESHOLD,
+    FFMPEG_PATH,
+    compare_audio_fingerprints,
+    compare_hash_lists,
+    find_video_files,
+    get_audio_fingerprint,
+    get_frame_hashes,
+)
+
+
+def time_call(func, video):
+    """함수 실행 시간(초)과 결과 반환"""
+    start = time.perf_counter()
+    result = func(video)
+    return time.perf_counter() - start, result
+
+
+def report_agreement(videos, frame_results, audio_results):
+    """모든 파일 쌍에 대해 프레임 해시 판정과 오디오 판정의 일치도 출력"""
+    both = frame_only = audio_only = neither = skipped = 0
+    vetoed = []            # 프레임으로는 중복인데 오디오가 거부한 쌍
+    frame_dup_distances = []
+
+    for i, j in combinations(range(len(videos)), 2):
+        hashes1, hashes2 = frame_results[i], frame_results[j]
+        audio1, audio2 = audio_results[i], audio_results[j]
+        if not (hashes1 and hashes2 and audio1 and audio2):
+            skipped += 1
+            continue
+
+        frame_dup, _ = compare_hash_lists(hashes1, hashes2)
+        audio_dup, audio_distance = compare_audio_fingerprints(audio1, audio2)
+
+        if frame_dup:
+            frame_dup_distances.append(audio_distance)
+        if frame_dup and audio_dup:
+            both += 1
+        elif frame_dup:
+            frame_only += 1
+            vetoed.append((videos[i], videos[j], audio_distance))
+        elif audio_dup:
+            audio_only += 1
+        else:
+            neither += 1
+
+    compared = both + frame_only + audio_only + neither
+
+    print("\n" + "=" * 60, flush=True)
+    print(f"판정 일치도 (오디오 기준 거리 {AUDIO_THRESHOLD}, 비교한 쌍 {compared}개, "
+          f"지문 없음으로 제외 {skipped}개)", flush=True)
+    print("=" * 60, flush=True)
+    if not compared:
+        print("비교할 수 있는 쌍이 없습니다.", flush=True)
+        return
+
+    print(f"  둘 다 중복:        {both}", flush=True)
+    print(f"  프레임만 중복:     {frame_only}  (--audio 사용 시 놓치는 중복)", flush=True)
+    print(f"  오디오만 중복:     {audio_only}", flush=True)
+    print(f"  둘 다 중복 아님:   {neither}", flush=True)
+    print(f"  일치율: {(both + neither) * 100 / compared:.1f}%", flush=True)
+
+    if frame_dup_distances:
+        print(f"  프레임 중복 쌍의 오디오 거리: 최소 {min(frame_dup_distances):.2f}, "
+              f"최대 {max(frame_dup_distances):.2f}", flush=True)
+
+    for video1, video2, distance in vetoed:
+        print(f"    오디오 거부 (거리 {distance:.2f}): {video1.name} <-> {video2.name}", flush=True)
+
+
+def main():
+    search_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    max_files = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    if not FFMPEG_PATH:
+        print("오류: ffmpeg를 찾을 수 없어 오디오 지문을 측정할 수 없습니다.", flush=True)
+        return
+
+    videos = find_video_files(search_path)[:max_files]
+    if not videos:
+        print("동영상 파일을 찾을 수 없습니다.", flush=True)
+        return
+
+    print(f"\n{len(videos)}개 파일 측정 중...\n", flush=True)
+    print(f"  {'프레임 해시':>12} {'오디오 지문':>12}  파일", flush=True)
+
+    frame_times, audio_times = [], []
+    frame_results, audio_results = [], []
+
+    for video in videos:
+        frame_time, hashes = time_call(get_frame_hashes, video)
+        audio_time, audio = time_call(get_audio_fingerprint, video)
+
+        frame_times.append(frame_time)
+        audio_times.append(audio_time)
+        frame_results.append(hashes)
+        audio_results.append(audio)
+
+        print(f"  {frame_time:>11.2f}s {audio_time:>11.2f}s  {video.name}", flush=True)
+
+    frame_avg = sum(frame_times) / len(frame_times)
+    audio_avg = sum(audio_times) / len(audio_times)
+    frame_ok = sum(1 for r in frame_results if r)
+    audio_ok = sum(1 for r in audio_results if r)
+
+    print("\n" + "=" * 60, flush=True)
+    print(f"프레임 해시: 파일당 평균 {frame_avg:.2f}초 (성공 {frame_ok}/{len(videos)})", flush=True)
+    print(f"오디오 지문: 파일당 평균 {audio_avg:.2f}초 (성공 {audio_ok}/{len(videos)})", flush=True)
+    if audio_avg > 0:
+        print(f"오디오 지문이 {frame_avg / audio_avg:.1f}배 빠름", flush=True)
+    print("=" * 60, flush=True)
+
+    report_agreement(videos, frame_results, audio_results)
+
+
+if __name__ == "__main__":
+    main()
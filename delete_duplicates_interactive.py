@@ -23,6 +23,25 @@ def format_size(size_bytes):
         size_bytes /= 1024
     return f"{size_bytes:.2f} TB"
 
+# 스캔 시 원본(보존 추천)을 고른 화질 비교 항목
+QUALITY_LABELS = {'resolution': '해상도', 'bitrate': '비트레이트', 'fps': '프레임레이트'}
+
+def format_video_info(info):
+    """스트림 정보를 한 줄로 표시 (예: 1920x1080, avc1, 4500 kbps, 29.97 fps)"""
+    if not info:
+        return "정보 없음"
+
+    parts = []
+    if info.get('width') and info.get('height'):
+        parts.append(f"{info['width']}x{info['height']}")
+    if info.get('codec'):
+        parts.append(info['codec'])
+    if info.get('bitrate'):
+        parts.append(f"{info['bitrate']} kbps")
+    if info.get('fps'):
+        parts.append(f"{info['fps']} fps")
+    return ", ".join(parts) or "정보 없음"
+
 def get_folder_name(file_path):
     """파일이 속한 폴더명 반환"""
     return Path(file_path).parent.name
@@ -56,11 +75,25 @@ def analyze_duplicate_type(dup):
     else:
         if orig_size > dup_size:
             reasons.append(f"중복본이 저화질 버전 (크기 {size_diff_percent:.0f}% 작음)")
+        elif dup.get('keeper_reason') in QUALITY_LABELS:
+            label = QUALITY_LABELS[dup['keeper_reason']]
+            reasons.append(f"원본이 더 작지만 {label}가 더 높음 (크기 {size_diff_percent:.0f}% 작음)")
         else:
             reasons.append(f"원본이 저화질 버전 (크기 {size_diff_percent:.0f}% 작음)")
 
+    # 스트림 정보 분석 (스캔 시 기록된 정보 사용, 파일을 다시 열지 않음)
+    orig_info = dup.get('original_info') or {}
+    dup_info = dup.get('duplicate_info') or {}
+    if orig_info.get('height') and dup_info.get('height') and orig_info['height'] != dup_info['height']:
+        reasons.append(f"해상도 다름 (원본 {orig_info['width']}x{orig_info['height']}, "
+                       f"중복본 {dup_info['width']}x{dup_info['height']})")
+    if orig_info.get('codec') and dup_info.get('codec') and orig_info['codec'] != dup_info['codec']:
+        reasons.append(f"코덱 다름 (원본 {orig_info['codec']}, 중복본 {dup_info['codec']})")
+
     # 유사도 분석
-    if similarity == 0:
+    if dup.get('match_type') == 'audio':
+        reasons.append(f"오디오 지문 일치 (프레임 비교 불가, 비트 거리: {similarity})")
+    elif similarity == 0:
         reasons.append("영상 내용 완전 일치 (해시 거리: 0)")
     elif similarity <= 2:
         reasons.append(f"영상 내용 거의 일치 (해시 거리: {similarity})")
@@ -72,7 +105,7 @@ def analyze_duplicate_type(dup):
 def print_separator():
     print("\n" + "=" * 70)
 
-def print_file_info(label, file_path, size, marker=""):
+def print_file_info(label, file_path, size, marker="", info=None):
     """파일 정보 출력"""
     folder = get_parent_folders(file_path, 2)
     filename = Path(file_path).name
@@ -81,6 +114,7 @@ def print_file_info(label, file_path, size, marker=""):
     print(f"    파일명: {filename}")
     print(f"    폴더:   {folder}")
     print(f"    크기:   {format_size(size)}")
+    print(f"    화질:   {format_video_info(info)}")
     print(f"    전체경로: {file_path}")
 
 def main():
@@ -162,8 +196,13 @@ def main():
         for reason in reasons:
             print(f"    • {reason}")
 
-        # 추천 표시 (크기가 작은 쪽 삭제 추천)
-        if orig_size > dup_size:
+        # 추천 표시 (스캔 시 화질로 원본을 골랐으면 중복본, 아니면 크기가 작은 쪽 삭제 추천)
+        keeper_reason = dup.get('keeper_reason')
+
+        if keeper_reason in QUALITY_LABELS:
+            recommend = "2"
+            print(f"\n  [추천] 파일2 삭제 ({QUALITY_LABELS[keeper_reason]}가 더 낮음)")
+        elif orig_size > dup_size:
             recommend = "2"
             print(f"\n  [추천] 파일2 삭제 (저화질/작은 파일)")
         elif orig_size < dup_size:
@@ -177,8 +216,8 @@ def main():
         marker1 = " ← 추천 삭제" if recommend == "1" else ""
         marker2 = " ← 추천 삭제" if recommend == "2" else ""
 
-        print_file_info("파일1", orig_path, orig_size, marker1)
-        print_file_info("파일2", dup_path, dup_size, marker2)
+        print_file_info("파일1", orig_path, orig_size, marker1, dup.get('original_info'))
+        print_file_info("파일2", dup_path, dup_size, marker2, dup.get('duplicate_info'))
 
         # 크기 차이 표시
         size_diff = abs(orig_size - dup_size)
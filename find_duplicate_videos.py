@@ -3,20 +3,38 @@
 중복 동영상 파일 탐지 스크립트
 - 1차: 영상 길이(duration)가 같은 파일들을 그룹화
 - 2차: 최초 10초 프레임의 이미지 해시를 비교하여 중복 판정
+- (선택, --audio) ffmpeg가 있으면 최초 30초 오디오 지문으로 먼저 걸러내고,
+  프레임 해시를 얻지 못한 정지 화면 영상은 오디오로 판정
+- 원본(보존 추천)은 길이 분석 때 함께 읽은 해상도 > 코덱 보정 비트레이트 > fps 순으로 비교하여 선택
 """
 
+import hashlib
 import os
+import shutil
+import sqlite3
+import subprocess
 import sys
+import tempfile
+import threading
+import time
 import warnings
 
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
 # OpenCV 경고 억제
 os.environ["OPENCV_LOG_LEVEL"] = "SILENT"
 warnings.filterwarnings("ignore")
 
 import cv2
 import imagehash
+import numpy as np
 from PIL import Image
 from collections import defaultdict
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 import json
 from datetime import datetime
@@ -27,8 +45,34 @@ sys.stdout.reconfigure(encoding='utf-8')
 # 지원하는 동영상 확장자
 VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpeg', '.mpg', '.3gp'}
 
-def get_video_duration(video_path):
-    """동영상의 길이(초)를 반환"""
+# 오디오 지문 설정 - --audio 옵션을 주면 ffmpeg로 오디오를 로컬 디코딩 (ffmpeg가 없으면 생략)
+FFMPEG_PATH = shutil.which('ffmpeg')
+AUDIO_SAMPLE_RATE = 8000
+AUDIO_THRESHOLD = 4  # 구간당 허용 비트 거리 (24비트 중)
+
+# 코덱별 압축 효율 (같은 화질에 필요한 비트레이트 기준, H.264 = 1.0)
+CODEC_EFFICIENCY = {
+    'av01': 2.0,
+    'hevc': 1.6, 'hev1': 1.6, 'hvc1': 1.6, 'h265': 1.6,
+    'vp09': 1.5, 'vp90': 1.5,
+    'avc1': 1.0, 'h264': 1.0, 'x264': 1.0,
+    'vp80': 0.8, 'vp08': 0.8,
+    'wvc1': 0.8, 'wmv3': 0.7, 'wmv2': 0.5, 'wmv1': 0.5,
+    'xvid': 0.6, 'divx': 0.6, 'dx50': 0.6, 'mp4v': 0.6, 'fmp4': 0.6,
+    'mpg2': 0.4, 'mpg1': 0.3,
+}
+
+# 영상 지문(길이 + 스트림 정보 + 프레임 해시 + 오디오) 인덱스 DB - 스캔 간에 재사용
+FINGERPRINT_INDEX_FILE = Path(__file__).parent / "fingerprint_index.db"
+LEGACY_INDEX_FILE = Path(__file__).parent / "fingerprint_index.json"  # 이전 형식 (DB가 없을 때 한 번 가져옴)
+INDEX_SAVE_INTERVAL = 20  # 폴더 N개 처리마다 인덱스 저장
+INDEX_SAVE_SECONDS = 60   # 길이 분석 중 인덱스 저장 간격(초)
+
+def get_video_info(video_path):
+    """
+    한 번의 VideoCapture로 영상 길이와 스트림 정보를 함께 읽음
+    반환: {'duration', 'width', 'height', 'fps', 'codec', 'bitrate'(kbps)} 또는 None
+    """
     try:
         cap = cv2.VideoCapture(str(video_path))
         if not cap.isOpened():
@@ -36,15 +80,38 @@ def get_video_duration(video_path):
 
         fps = cap.get(cv2.CAP_PROP_FPS)
         frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        bitrate = cap.get(cv2.CAP_PROP_BITRATE) if hasattr(cv2, 'CAP_PROP_BITRATE') else 0
         cap.release()
 
+        duration = None
         if fps > 0 and frame_count > 0:
-            duration = frame_count / fps
-            return round(duration, 2)  # 소수점 2자리까지
-        return None
+            duration = round(frame_count / fps, 2)  # 소수점 2자리까지
+
+        # 백엔드가 비트레이트를 주지 않으면 파일 크기로 전체 비트레이트 추정
+        if not bitrate and duration:
+            bitrate = os.path.getsize(video_path) * 8 / duration / 1000
+
+        codec = "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip("\0 ").lower()
+
+        return {
+            'duration': duration,
+            'width': width,
+            'height': height,
+            'fps': round(fps, 2) if fps > 0 else None,
+            'codec': codec or None,
+            'bitrate': round(bitrate) if bitrate else None
+        }
     except Exception:
         return None
 
+def get_video_duration(video_path):
+    """동영상의 길이(초)를 반환"""
+    info = get_video_info(video_path)
+    return info['duration'] if info else None
+
 def get_frame_hashes(video_path, max_seconds=10, sample_interval=0.5):
     """
     영상의 최초 max_seconds 초 동안 sample_interval 간격으로 프레임을 추출하여 해시 생성
@@ -91,6 +158,336 @@ def get_frame_hashes(video_path, max_seconds=10, sample_interval=0.5):
     except Exception:
         return None
 
+def get_audio_fingerprint(video_path, max_seconds=30, sample_rate=AUDIO_SAMPLE_RATE):
+    """
+    영상의 최초 max_seconds 초 오디오를 낮은 샘플레이트로 디코딩하여 크로마 지문 생성
+    - 1초 구간마다 24비트 코드: 12음계 에너지가 평균보다 큰지 + 직전 구간보다 커졌는지
+    반환: 정수 코드 리스트
+          오디오가 없거나 무음이면 빈 리스트, ffmpeg가 없거나 디코딩이 실패/시간 초과면 None
+    """
+    if not FFMPEG_PATH:
+        return None
+
+    try:
+        result = subprocess.run(
+            [FFMPEG_PATH, '-v', 'quiet', '-nostdin', '-i', str(video_path),
+             '-t', str(max_seconds), '-vn', '-ac', '1', '-ar', str(sample_rate),
+             '-f', 's16le', '-'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=120)
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    samples = np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768
+    if samples.size == 0 or np.sqrt(np.mean(samples ** 2)) < 1e-3:
+        return []
+
+    # 단시간 푸리에 변환
+    n_fft = 2048
+    hop = 1024
+    n_frames = (samples.size - n_fft) // hop + 1
+    if n_frames < 1:
+        return []
+
+    idx = np.arange(n_fft)[None, :] + hop * np.arange(n_frames)[:, None]
+    spectrum = np.abs(np.fft.rfft(samples[idx] * np.hanning(n_fft), axis=1)) ** 2
+
+    # 주파수 빈을 12음계(크로마)로 합산
+    freqs = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+    valid = (freqs >= 100) & (freqs <= sample_rate / 2 - 500)
+    pitch_class = (np.round(12 * np.log2(freqs[valid] / 440)).astype(int) + 9) % 12
+    chroma = spectrum[:, valid] @ np.eye(12)[pitch_class]
+
+    # 약 1초 구간으로 묶기
+    frames_per_segment = max(sample_rate // hop, 1)
+    n_segments = n_frames // frames_per_segment
+    if n_segments < 3:
+        return []
+
+    segments = chroma[:n_segments * frames_per_segment].reshape(n_segments, frames_per_segment, 12).sum(axis=1)
+    segments /= segments.sum(axis=1, keepdims=True) + 1e-12
+
+    above_mean = segments > segments.mean(axis=1, keepdims=True)
+    rising = np.zeros_like(above_mean)
+    rising[1:] = segments[1:] > segments[:-1]
+
+    weights = 1 << np.arange(12)
+    codes = (above_mean @ weights) | ((rising @ weights) << 12)
+    return [int(c) for c in codes]
+
+def compare_audio_fingerprints(audio1, audio2, threshold=AUDIO_THRESHOLD):
+    """
+    두 오디오 지문 비교
+    반환: (유사여부, 구간당 평균 비트 거리)
+    """
+    if not audio1 or not audio2:
+        return False, float('inf')
+
+    min_len = min(len(audio1), len(audio2))
+    total_distance = sum(bin(audio1[i] ^ audio2[i]).count('1') for i in range(min_len))
+
+    avg_distance = total_distance / min_len
+    return avg_distance <= threshold, avg_distance
+
+def index_key(video_path):
+    """인덱스 키 - 실행 위치와 대소문자(Windows)에 관계없이 같은 파일은 같은 키"""
+    return os.path.normcase(os.path.abspath(str(video_path)))
+
+def is_inside(path, parent):
+    """path가 parent 경로이거나 그 아래에 있으면 True"""
+    try:
+        return os.path.commonpath([path, parent]) == parent
+    except ValueError:  # Windows에서 드라이브가 다른 경우
+        return False
+
+class FingerprintIndex(dict):
+    """
+    지문 인덱스 {index_key: {'path', 'size', 'mtime', 'duration', 'hashes', ...}}
+    - 바뀐 항목과 지운 항목을 기록해 두어 저장할 때 해당 행만 DB에 반영
+    - 스캔 작업자(스레드)가 동시에 수정해도 안전하도록 변경 기록은 잠금으로 보호
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.dirty = set()
+        self.removed = set()
+
+    def mark_dirty(self, key):
+        with self.lock:
+            self.dirty.add(key)
+            self.removed.discard(key)
+
+    def update_entry(self, entry, **fields):
+        """항목의 여러 필드를 한 번에 갱신 (저장 중에 일부 필드만 기록되지 않음)"""
+        entry.update(fields)
+        self.mark_dirty(index_key(entry['path']))
+
+    def remove(self, key):
+        with self.lock:
+            self.pop(key, None)
+            self.dirty.discard(key)
+            self.removed.add(key)
+
+    def take_changes(self):
+        """저장할 변경 내역을 꺼내고 기록 초기화 - 반환: (바뀐 키 집합, 지운 키 집합)"""
+        with self.lock:
+            dirty, removed = self.dirty, self.removed
+            self.dirty, self.removed = set(), set()
+        return dirty, removed
+
+    def restore_changes(self, dirty, removed):
+        """저장에 실패한 변경 내역을 되돌려 다음 저장 때 다시 시도"""
+        with self.lock:
+            self.dirty |= dirty - self.removed
+            self.removed |= removed - self.dirty
+
+def connect_fingerprint_index(index_file):
+    """인덱스 DB 연결 (다른 프로세스가 기록 중이면 최대 60초 대기)"""
+    conn = sqlite3.connect(str(index_file), timeout=60)
+    conn.execute('CREATE TABLE IF NOT EXISTS files (key TEXT PRIMARY KEY, entry TEXT NOT NULL)')
+    return conn
+
+def load_legacy_fingerprint_index(index, legacy_file=LEGACY_INDEX_FILE):
+    """이전 형식(JSON) 인덱스를 가져와 모든 항목을 저장 대상으로 표시"""
+    try:
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return index
+
+    for key, entry in data.get('files', {}).items():
+        path = entry.get('path', key)
+        if os.path.isabs(path):
+            entry['path'] = path
+            index[index_key(path)] = entry
+            index.mark_dirty(index_key(path))
+    return index
+
+def load_fingerprint_index(index_file=FINGERPRINT_INDEX_FILE):
+    """
+    저장된 지문 인덱스 로드
+    - 파일이 있는지는 확인하지 않음 (연결되지 않은 드라이브의 지문도 유지, 정리는 prune_fingerprint_index)
+    - DB가 없으면 이전 형식(fingerprint_index.json)을 가져옴
+    반환: FingerprintIndex (없거나 읽을 수 없으면 빈 인덱스)
+    """
+    index = FingerprintIndex()
+    if not os.path.exists(index_file):
+        return load_legacy_fingerprint_index(index)
+
+    try:
+        with closing(connect_fingerprint_index(index_file)) as conn:
+            rows = conn.execute('SELECT key, entry FROM files').fetchall()
+    except sqlite3.Error as e:
+        print(f"  경고: 지문 인덱스를 읽을 수 없어 빈 인덱스로 시작합니다 ({e})", flush=True)
+        return index
+
+    for key, text in rows:
+        try:
+            index[key] = json.loads(text)
+        except ValueError:
+            continue
+    return index
+
+def get_umask():
+    """현재 umask (읽으려면 잠시 바꿔야 하므로 작업자 스레드가 없는 import 시점에만 호출)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+FILE_MODE = 0o666 & ~get_umask()  # 새 파일의 기본 권한 (mkstemp는 0600으로 만듦)
+
+def write_json_atomic(file_path, data, indent=None):
+    """
+    임시 파일에 쓴 뒤 교체하여 기록 중 중단되어도 기존 파일 유지
+    - 임시 파일 이름이 작업자마다 달라 여러 작업자가 동시에 써도 서로 덮어쓰지 않음
+    - 디스크에 기록(fsync)한 뒤 교체하므로 중단 시 파일이 잘린 상태로 남지 않음
+    - 교체 후 폴더도 fsync하여 정전 시에도 교체 결과가 남음 (POSIX)
+    """
+    file_path = Path(file_path)
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=file_path.name + ".", suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, FILE_MODE)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    if os.name == 'posix':
+        dir_fd = os.open(file_path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def save_fingerprint_index(index, index_file=FINGERPRINT_INDEX_FILE):
+    """
+    바뀐 항목만 인덱스 DB에 기록
+    - 항목(행) 단위로 갱신하므로 감시 모드와 검사가 동시에 저장해도 서로의 항목을 덮어쓰지 않음
+    - 새 파일 하나를 추가할 때 전체 인덱스를 다시 쓰지 않음
+    - 저장에 실패하면 경고만 출력하고 다음 저장 때 다시 시도 (인덱스는 캐시이므로 검사는 계속)
+    """
+    dirty, removed = index.take_changes()
+    rows = []
+    for key in dirty:
+        entry = index.get(key)
+        if entry is not None:
+            # 작업자가 수정 중일 수 있으므로 복사본을 기록
+            rows.append((key, json.dumps(dict(entry), ensure_ascii=False)))
+    if not rows and not removed:
+        return
+
+    try:
+        with closing(connect_fingerprint_index(index_file)) as conn, conn:
+            conn.executemany('INSERT OR REPLACE INTO files (key, entry) VALUES (?, ?)', rows)
+            conn.executemany('DELETE FROM files WHERE key = ?', [(key,) for key in removed])
+    except sqlite3.Error as e:
+        index.restore_changes(dirty, removed)
+        print(f"  경고: 지문 인덱스 저장 실패 ({e})", flush=True)
+
+def prune_fingerprint_index(index, root, found_files):
+    """
+    실제로 검색한 경로(root) 아래에서 찾지 못한 파일의 항목 제거
+    - 다른 경로나 연결되지 않은 드라이브의 항목은 그대로 유지
+    """
+    root_key = index_key(root)
+    found = {index_key(path) for path in found_files}
+    for key in list(index):
+        if key not in found and is_inside(key, root_key):
+            index.remove(key)
+
+def get_index_entry(index, video_path):
+    """
+    인덱스에서 파일 항목 반환
+    파일 크기/수정시간이 바뀌었으면 이전 지문을 버리고 새 항목 생성
+    """
+    path = os.path.abspath(str(video_path))
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    key = index_key(path)
+    entry = index.get(key)
+    if not entry or entry.get('size') != st.st_size or entry.get('mtime') != st.st_mtime:
+        entry = {'path': path, 'size': st.st_size, 'mtime': st.st_mtime}
+        index[key] = entry
+        index.mark_dirty(key)
+    return entry
+
+def get_cached_value(video_path, index, field, compute):
+    """인덱스가 있으면 저장된 값(field) 재사용, 없으면 compute로 계산하여 저장"""
+    if index is None:
+        return compute(video_path)
+
+    entry = get_index_entry(index, video_path)
+    if entry is None:
+        return None
+    if field not in entry:
+        index.update_entry(entry, **{field: compute(entry['path'])})
+    return entry[field]
+
+def get_cached_info(video_path, index=None):
+    """인덱스가 있으면 저장된 스트림 정보 재사용, 없으면 새로 계산 (영상 길이도 함께 저장)"""
+    if index is None:
+        return get_video_info(video_path)
+
+    entry = get_index_entry(index, video_path)
+    if entry is None:
+        return None
+    if 'info' not in entry:
+        info = get_video_info(entry['path'])
+        index.update_entry(entry, info=info, duration=info['duration'] if info else None)
+    return entry['info']
+
+def get_cached_duration(video_path, index=None):
+    """인덱스가 있으면 저장된 영상 길이 재사용, 없으면 새로 계산"""
+    if index is None:
+        return get_video_duration(video_path)
+
+    info = get_cached_info(video_path, index)
+    return info['duration'] if info else None
+
+def get_cached_hashes(video_path, index=None):
+    """인덱스가 있으면 저장된 프레임 해시 재사용, 없으면 새로 계산"""
+    return get_cached_value(video_path, index, 'hashes', get_frame_hashes)
+
+def get_cached_audio(video_path, index=None):
+    """
+    인덱스가 있으면 저장된 오디오 지문 재사용, 없으면 새로 계산
+    ffmpeg가 없거나 디코딩이 실패한 결과는 저장하지 않아 다음 검사 때 다시 시도
+    """
+    if not FFMPEG_PATH:
+        return None
+    if index is None:
+        return get_audio_fingerprint(video_path)
+
+    entry = get_index_entry(index, video_path)
+    if entry is None:
+        return None
+    if entry.get('audio') is None:
+        audio = get_audio_fingerprint(entry['path'])
+        if audio is None:
+            return None
+        index.update_entry(entry, audio=audio)
+    return entry['audio']
+
+def build_duration_lookup(index):
+    """인덱스를 영상 길이별로 묶음: {길이: [파일경로, ...]}"""
+    lookup = defaultdict(list)
+    for entry in index.values():
+        duration = entry.get('duration')
+        if duration is not None:
+            lookup[duration].append(entry['path'])
+    return lookup
+
 def compare_hash_lists(hashes1, hashes2, threshold=5):
     """
     두 해시 리스트를 비교하여 유사도 판정
@@ -112,14 +509,19 @@ def compare_hash_lists(hashes1, hashes2, threshold=5):
     avg_distance = total_distance / min_len
     return avg_distance <= threshold, avg_distance
 
-def find_video_files(root_path):
-    """지정된 경로에서 모든 동영상 파일 찾기"""
+def find_video_files(root_path, stop_event=None):
+    """
+    지정된 경로에서 모든 동영상 파일 찾기
+    stop_event: 설정되면 검색을 멈추고 그때까지 찾은 파일만 반환
+    """
     videos = []
     root = Path(root_path)
 
     print(f"\n[1단계] 동영상 파일 검색 중: {root_path}", flush=True)
 
     for path in root.rglob('*'):
+        if stop_event is not None and stop_event.is_set():
+            break
         try:
             if path.is_file() and path.suffix.lower() in VIDEO_EXTENSIONS:
                 videos.append(path)
@@ -131,7 +533,7 @@ def find_video_files(root_path):
     print(f"  총 {len(videos)}개의 동영상 파일 발견", flush=True)
     return videos
 
-def group_by_duration(videos):
+def group_by_duration(videos, index=None):
     """동영상을 길이별로 그룹화"""
     print(f"\n[2단계] 영상 길이 분석 중...", flush=True)
 
@@ -141,7 +543,7 @@ def group_by_duration(videos):
         if i % 50 == 0:
             print(f"  진행: {i}/{len(videos)} ({i*100//len(videos)}%)", flush=True)
 
-        duration = get_video_duration(video)
+        duration = get_cached_duration(video, index)
         if duration is not None:
             duration_groups[duration].append(video)
 
@@ -153,7 +555,7 @@ def group_by_duration(videos):
 
     return potential_duplicates
 
-def group_by_duration_and_folder(videos):
+def group_by_duration_and_folder(videos, index=None):
     """동영상을 (폴더, 길이) 기준으로 그룹화 - 같은 폴더 내에서만 비교"""
     print(f"\n[2단계] 영상 길이 분석 중 (같은 폴더 내 비교 모드)...", flush=True)
 
@@ -164,7 +566,7 @@ def group_by_duration_and_folder(videos):
         if i % 50 == 0:
             print(f"  진행: {i}/{len(videos)} ({i*100//len(videos)}%)", flush=True)
 
-        duration = get_video_duration(video)
+        duration = get_cached_duration(video, index)
         if duration is not None:
             folder = str(video.parent)
             folder_duration_groups[(folder, duration)].append(video)
@@ -178,63 +580,192 @@ def group_by_duration_and_folder(videos):
 
     return potential_duplicates
 
-def find_duplicates_in_group(videos, threshold=5):
+def quality_components(info):
+    """
+    화질 비교 항목 (우선순위 순): 해상도(픽셀 수) > 코덱 효율을 반영한 비트레이트 > 프레임레이트
+    반환: [(항목 이름, 값 또는 모르면 None), ...]
+    """
+    info = info or {}
+    pixels = info['width'] * info['height'] if info.get('width') and info.get('height') else None
+    bitrate = info['bitrate'] * CODEC_EFFICIENCY.get(info.get('codec'), 1.0) if info.get('bitrate') else None
+
+    return [('resolution', pixels), ('bitrate', bitrate), ('fps', info.get('fps'))]
+
+def compare_video_quality(info1, info2, tolerance=0.05):
+    """
+    두 영상의 화질 비교 - 우선순위 순으로, 양쪽 모두 값을 아는 항목만 비교
+    (tolerance 이내의 차이는 같다고 보고 다음 항목으로 넘어감)
+    반환: (1 = 첫 번째가 좋음 / -1 = 두 번째가 좋음 / 0 = 판단 불가, 결정한 항목 이름 또는 None)
+    """
+    for (name, value1), (_, value2) in zip(quality_components(info1), quality_components(info2)):
+        if value1 is None or value2 is None:
+            continue
+        if abs(value1 - value2) <= tolerance * max(value1, value2):
+            continue
+        return (1 if value1 > value2 else -1), name
+
+    return 0, None
+
+def make_duplicate_record(video1, video2, avg_distance, match_type='video', index=None):
+    """
+    유사한 두 영상으로 중복 기록 생성
+    - 스트림 정보로 화질이 좋은 쪽을 원본(보존 추천)으로, 판단할 수 없으면 크기가 큰 쪽
+    - 검토 시 파일을 다시 열지 않도록 스트림 정보와 원본 선택 근거도 함께 기록
+    match_type: 판정 근거 ('video' = 프레임 해시, 'audio' = 오디오 지문)
+    반환: dict 또는 파일 접근 실패 시 None
+    """
+    try:
+        size1 = os.stat(video1).st_size
+        size2 = os.stat(video2).st_size
+    except OSError:
+        return None
+
+    info1 = get_cached_info(video1, index)
+    info2 = get_cached_info(video2, index)
+    better, keeper_reason = compare_video_quality(info1, info2)
+
+    if better:
+        keep_first = better > 0
+    else:
+        keep_first = size1 >= size2
+        keeper_reason = 'size'
+
+    first = (video1, size1, info1)
+    second = (video2, size2, info2)
+    original, duplicate = (first, second) if keep_first else (second, first)
+
+    return {
+        'original': str(original[0]),
+        'duplicate': str(duplicate[0]),
+        'original_size': original[1],
+        'duplicate_size': duplicate[1],
+        'similarity': round(avg_distance, 2),
+        'match_type': match_type,
+        'original_info': original[2],
+        'duplicate_info': duplicate[2],
+        'keeper_reason': keeper_reason
+    }
+
+def compare_videos(video1, video2, get_hashes, get_audio, threshold=5, use_audio=False):
+    """
+    두 영상 비교
+    - 오디오 지문이 둘 다 있고 서로 다르면 프레임 디코딩 없이 중복 아님으로 판정
+    - 프레임 해시가 있으면 프레임으로 판정
+    - 프레임 해시를 얻지 못하면(정지 화면 강의 영상 등) 오디오 지문으로만 판정
+    반환: (유사여부, 거리, 판정근거)
+    """
+    audio_similar = False
+    audio_distance = float('inf')
+
+    if use_audio and FFMPEG_PATH:
+        audio1 = get_audio(video1)
+        audio2 = get_audio(video2)
+        if audio1 and audio2:
+            audio_similar, audio_distance = compare_audio_fingerprints(audio1, audio2)
+            if not audio_similar:
+                return False, audio_distance, 'audio'
+
+    hashes1 = get_hashes(video1)
+    hashes2 = get_hashes(video2) if hashes1 else None
+
+    if hashes1 and hashes2:
+        is_similar, avg_distance = compare_hash_lists(hashes1, hashes2, threshold)
+        return is_similar, avg_distance, 'video'
+
+    return audio_similar, audio_distance, 'audio'
+
+def find_duplicates_in_group(videos, threshold=5, index=None, use_audio=False, can_pair=None):
     """
     같은 길이를 가진 동영상들 중에서 실제 중복 찾기
+    index가 주어지면 프레임 해시/오디오 지문을 인덱스에서 재사용/저장
+    can_pair(video1, video2)가 주어지면 True인 쌍만 비교
     반환: [(원본, 중복본, 유사도), ...]
     """
     duplicates = []
     processed = set()
     hash_cache = {}
+    audio_cache = {}
 
-    for i, video1 in enumerate(videos):
-        if str(video1) in processed:
-            continue
+    # 해시 캐싱 (필요해질 때만 디코딩)
+    def get_hashes(video):
+        if str(video) not in hash_cache:
+            hash_cache[str(video)] = get_cached_hashes(video, index)
+        return hash_cache[str(video)]
 
-        # 해시 캐싱
-        if str(video1) not in hash_cache:
-            hash_cache[str(video1)] = get_frame_hashes(video1)
-        hashes1 = hash_cache[str(video1)]
+    def get_audio(video):
+        if str(video) not in audio_cache:
+            audio_cache[str(video)] = get_cached_audio(video, index)
+        return audio_cache[str(video)]
 
-        if not hashes1:
+    for i, video1 in enumerate(videos):
+        if str(video1) in processed:
             continue
 
         for video2 in videos[i+1:]:
             if str(video2) in processed:
                 continue
-
-            if str(video2) not in hash_cache:
-                hash_cache[str(video2)] = get_frame_hashes(video2)
-            hashes2 = hash_cache[str(video2)]
-
-            if not hashes2:
+            if can_pair is not None and not can_pair(video1, video2):
                 continue
 
-            is_similar, avg_distance = compare_hash_lists(hashes1, hashes2, threshold)
+            is_similar, avg_distance, match_type = compare_videos(
+                video1, video2, get_hashes, get_audio, threshold, use_audio)
 
             if is_similar:
-                # 파일 크기가 큰 것을 원본으로 간주
-                try:
-                    size1 = video1.stat().st_size
-                    size2 = video2.stat().st_size
-                except OSError:
+                record = make_duplicate_record(video1, video2, avg_distance, match_type, index)
+                if record is None:
                     continue
 
-                if size1 >= size2:
-                    original, duplicate = video1, video2
-                    orig_size, dup_size = size1, size2
-                else:
-                    original, duplicate = video2, video1
-                    orig_size, dup_size = size2, size1
-
-                duplicates.append({
-                    'original': str(original),
-                    'duplicate': str(duplicate),
-                    'original_size': orig_size,
-                    'duplicate_size': dup_size,
-                    'similarity': round(avg_distance, 2)
-                })
-                processed.add(str(duplicate))
+                duplicates.append(record)
+                processed.add(record['duplicate'])
+
+    return duplicates
+
+def find_duplicates_for_video(video_path, index, duration_lookup, threshold=5, use_audio=False):
+    """
+    새 동영상 하나를 지문 인덱스와 비교 (감시 모드용)
+    - 새 파일만 디코딩하고, 같은 길이의 기존 파일은 인덱스의 지문으로 비교
+    - 새 파일의 지문은 인덱스와 duration_lookup에 추가됨
+    - 후보의 길이는 인덱스로 다시 확인 (감시 중에 바뀐 파일은 이전 길이로 비교하지 않음)
+    반환: 중복 기록 리스트
+    """
+    key = os.path.abspath(str(video_path))
+    duration = get_cached_duration(key, index)
+    if duration is None:
+        return []
+
+    hashes = get_cached_hashes(key, index)
+    audio = get_cached_audio(key, index) if use_audio and FFMPEG_PATH else None
+    if not hashes and not audio:
+        return []
+
+    duplicates = []
+    candidates = duration_lookup[duration]
+
+    for other in list(candidates):
+        if index_key(other) == index_key(key):
+            continue
+
+        # 목록을 만든 뒤 바뀌거나 삭제된 파일은 현재 길이의 그룹으로 옮기고 건너뜀
+        other_duration = get_cached_duration(other, index)
+        if other_duration != duration:
+            candidates.remove(other)
+            if other_duration is not None and other not in duration_lookup[other_duration]:
+                duration_lookup[other_duration].append(other)
+            continue
+
+        is_similar, avg_distance, match_type = compare_videos(
+            key, other,
+            lambda v: get_cached_hashes(v, index),
+            lambda v: get_cached_audio(v, index),
+            threshold, use_audio)
+
+        if is_similar:
+            record = make_duplicate_record(key, other, avg_distance, match_type, index)
+            if record is not None:
+                duplicates.append(record)
+
+    if not any(index_key(other) == index_key(key) for other in candidates):
+        candidates.append(key)
 
     return duplicates
 
@@ -251,7 +782,7 @@ def main():
     search_path = "F:\\"
 
     if len(sys.argv) > 1:
-        search_path = sys.argv[1]
+        search_path = os.path.abspath(sys.argv[1])
 
     if not os.path.exists(search_path):
         print(f"오류: 경로를 찾을 수 없습니다: {search_path}", flush=True)
@@ -270,8 +801,14 @@ def main():
         print("동영상 파일을 찾을 수 없습니다.", flush=True)
         return
 
+    # 이전 스캔의 지문 인덱스 로드 (변경되지 않은 파일은 다시 디코딩하지 않음)
+    # 검색한 경로 아래에서 사라진 파일의 항목은 정리
+    index = load_fingerprint_index()
+    prune_fingerprint_index(index, search_path, videos)
+
     # 2. (폴더, 길이)별로 그룹화 - 같은 폴더 내에서만 비교
-    duration_groups = group_by_duration_and_folder(videos)
+    duration_groups = group_by_duration_and_folder(videos, index)
+    save_fingerprint_index(index)
 
     if not duration_groups:
         print("중복 후보 파일이 없습니다.", flush=True)
@@ -289,12 +826,14 @@ def main():
         folder_name = os.path.basename(folder) or folder
         print(f"  그룹 {group_num}/{total_groups}: [{folder_name}] 길이 {duration}초, {len(group_videos)}개 파일 비교 중...", flush=True)
 
-        duplicates = find_duplicates_in_group(group_videos)
+        duplicates = find_duplicates_in_group(group_videos, index=index)
         all_duplicates.extend(duplicates)
 
         if duplicates:
             print(f"    -> {len(duplicates)}쌍 중복 발견!", flush=True)
 
+    save_fingerprint_index(index)
+
     # 4. 결과 출력
     print("\n" + "=" * 60, flush=True)
     print("검색 결과", flush=True)
@@ -311,7 +850,7 @@ def main():
     for i, dup in enumerate(all_duplicates, 1):
         print(f"[{i}] 중복 발견 (유사도 거리: {dup['similarity']})", flush=True)
         print(f"  원본:   {dup['original']}", flush=True)
-        print(f"          크기: {format_size(dup['original_size'])}", flush=True)
+        print(f"          크기: {format_size(dup['original_size'])} (원본 선택 근거: {dup['keeper_reason']})", flush=True)
         print(f"  중복본: {dup['duplicate']}", flush=True)
         print(f"          크기: {format_size(dup['duplicate_size'])}", flush=True)
         print(f"  절약 가능: {format_size(dup['duplicate_size'])}", flush=True)
@@ -325,48 +864,183 @@ def main():
     # 5. 결과를 JSON 파일로 저장
     result_file = Path(__file__).parent / f"duplicate_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
-    with open(result_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'search_path': search_path,
-            'scan_time': datetime.now().isoformat(),
-            'total_videos_scanned': len(videos),
-            'duplicates_found': len(all_duplicates),
-            'total_recoverable_bytes': total_recoverable,
-            'duplicates': all_duplicates
-        }, f, ensure_ascii=False, indent=2)
+    write_json_atomic(result_file, {
+        'search_path': search_path,
+        'scan_time': datetime.now().isoformat(),
+        'total_videos_scanned': len(videos),
+        'duplicates_found': len(all_duplicates),
+        'total_recoverable_bytes': total_recoverable,
+        'duplicates': all_duplicates
+    }, indent=2)
 
     print(f"\n결과가 저장되었습니다: {result_file}", flush=True)
     print(f"\n완료 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
 
 
-def save_folder_result(results_dir, folder_path, folder_duplicates, folder_stats):
-    """폴더별 결과를 개별 JSON 파일로 저장"""
+def get_folder_result_file(results_dir, folder_path):
+    """
+    폴더별 결과 파일 경로
+    - 폴더 이름 뒤에 전체 경로의 해시를 붙여, 이름이 같은 다른 폴더끼리 겹치지 않음
+    """
     # 폴더 이름에서 파일명으로 사용할 수 없는 문자 제거
-    folder_name = os.path.basename(folder_path) or "root"
+    folder_name = os.path.basename(os.path.normpath(folder_path)) or "root"
     safe_name = "".join(c if c.isalnum() or c in (' ', '-', '_', '.') else '_' for c in folder_name)
+    path_hash = hashlib.sha1(folder_path.encode('utf-8')).hexdigest()[:10]
 
-    result_file = results_dir / f"{safe_name}.json"
+    return Path(results_dir) / f"{safe_name}_{path_hash}.json"
 
-    with open(result_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'folder_path': folder_path,
-            'scan_time': datetime.now().isoformat(),
-            'files_compared': folder_stats['files_compared'],
-            'duplicates_found': len(folder_duplicates),
-            'recoverable_bytes': folder_stats['recoverable_bytes'],
-            'duplicates': folder_duplicates
-        }, f, ensure_ascii=False, indent=2)
+def save_folder_result(results_dir, folder_path, folder_duplicates, folder_stats):
+    """폴더별 결과를 개별 JSON 파일로 저장 (원자적 교체, 병렬 작업자에서 호출해도 안전)"""
+    result_file = get_folder_result_file(results_dir, folder_path)
+
+    write_json_atomic(result_file, {
+        'folder_path': folder_path,
+        'scan_time': datetime.now().isoformat(),
+        'files_compared': folder_stats['files_compared'],
+        'duplicates_found': len(folder_duplicates),
+        'recoverable_bytes': folder_stats['recoverable_bytes'],
+        'duplicates': folder_duplicates
+    }, indent=2)
 
     return result_file
 
+held_locks = {}  # 잠금 파일 경로 -> 열어 둔 파일 디스크립터 (닫거나 프로세스가 끝나면 OS가 잠금 해제)
+
+def acquire_lock(lock_file):
+    """
+    잠금 파일에 OS 잠금(fcntl.flock / msvcrt.locking)을 걸고 프로세스가 끝날 때까지 유지
+    - 다른 실행 중인 프로세스가 잠갔으면 False
+    - 프로세스가 종료되면 OS가 잠금을 해제하므로, 남은 잠금 파일이나 재사용된 pid 때문에 잘못 판단하지 않음
+    - 잠금 파일은 지우지 않음 (지우는 사이 다른 프로세스가 새 파일을 잠가 두 프로세스가 함께 잠금을 가질 수 있음)
+    """
+    lock_file = os.path.abspath(str(lock_file))
+    if lock_file in held_locks:
+        return True
+
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        if sys.platform == 'win32':
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+
+    held_locks[lock_file] = fd
+    return True
+
+def acquire_results_lock(results_dir):
+    """결과 폴더 잠금 (job.lock) - 다른 실행 중인 프로세스가 같은 폴더를 처리 중이면 False"""
+    return acquire_lock(Path(results_dir) / "job.lock")
+
+def load_folder_results(results_dir):
+    """
+    이미 저장된 폴더별 결과 로드 (재개 기능) - 결과 폴더 잠금을 잡은 뒤에만 호출
+    - 읽을 수 없거나 손상된 파일은 경고 후 제외하여 해당 폴더를 다시 처리
+    - 남아 있는 임시 파일은 잠금을 잃은(종료된) 이전 작업의 것이므로 삭제
+    반환: {폴더경로: 결과 데이터}
+    """
+    results_dir = Path(results_dir)
+
+    for tmp_file in results_dir.glob("*.tmp"):
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+
+    folder_results = {}
+    for existing_file in results_dir.glob("*.json"):
+        if existing_file.name in ("summary.json", "job.json"):
+            continue
+
+        try:
+            with open(existing_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  경고: 결과 파일을 읽을 수 없어 다시 처리합니다: {existing_file.name} ({e})", flush=True)
+            continue
 
-def main_incremental():
-    """폴더별로 결과를 저장하며 진행하는 버전"""
+        if isinstance(data, dict) and 'folder_path' in data and 'duplicates' in data:
+            folder_results[data['folder_path']] = data
+        else:
+            print(f"  경고: 결과 파일 형식이 올바르지 않아 다시 처리합니다: {existing_file.name}", flush=True)
+
+    return folder_results
+
+def find_resumable_results_dir(search_path):
+    """
+    같은 검색 경로로 시작했지만 요약 파일이 없는(중단된) 가장 최근 결과 폴더
+    반환: (결과 폴더 또는 None, 다른 프로세스가 처리 중인지 여부)
+    - 찾은 폴더는 잠금을 잡은 상태로 반환
+    """
+    candidates = sorted(Path(__file__).parent.glob("results_*"), reverse=True)
+
+    for results_dir in candidates:
+        if not results_dir.is_dir() or (results_dir / "summary.json").exists():
+            continue
+        try:
+            with open(results_dir / "job.json", 'r', encoding='utf-8') as f:
+                if json.load(f).get('search_path') != search_path:
+                    continue
+        except (OSError, ValueError):
+            continue
+
+        if not acquire_results_lock(results_dir):
+            return results_dir, True
+        return results_dir, False
+
+    return None, False
+
+def create_results_dir(search_path):
+    """새 결과 폴더를 만들고 잠금 (같은 시각에 만든 폴더와 겹치지 않도록 번호를 붙임)"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    base_dir = Path(__file__).parent
+
+    for n in range(1, 100):
+        results_dir = base_dir / (f"results_{timestamp}" if n == 1 else f"results_{timestamp}_{n}")
+        try:
+            results_dir.mkdir()
+        except FileExistsError:
+            continue
+
+        if not acquire_results_lock(results_dir):
+            continue
+        write_json_atomic(results_dir / "job.json", {
+            'search_path': search_path,
+            'started': datetime.now().isoformat()
+        }, indent=2)
+        return results_dir
+
+    raise FileExistsError(f"결과 폴더를 만들 수 없습니다: results_{timestamp}")
+
+def write_summary(results_dir, search_path, total_videos, total_folders, duplicates, total_recoverable):
+    """전체 요약 파일 저장 - 요약 파일이 있는 결과 폴더는 완료된 작업으로 간주"""
+    summary_file = Path(results_dir) / "summary.json"
+    write_json_atomic(summary_file, {
+        'search_path': search_path,
+        'scan_time': datetime.now().isoformat(),
+        'total_videos_scanned': total_videos,
+        'total_folders_processed': total_folders,
+        'duplicates_found': len(duplicates),
+        'total_recoverable_bytes': total_recoverable,
+        'total_recoverable_formatted': format_size(total_recoverable),
+        'duplicates': duplicates
+    }, indent=2)
+    return summary_file
+
+
+def main_incremental(search_path=None, use_audio=False):
+    """
+    폴더별로 결과를 저장하며 진행하는 버전
+    use_audio: 오디오 지문으로 먼저 걸러내기 (--audio)
+    """
     # 검색 경로 설정
-    search_path = "E:\\"
+    if search_path is None:
+        search_path = "E:\\"
 
-    if len(sys.argv) > 1:
-        search_path = sys.argv[1]
+        if len(sys.argv) > 1:
+            search_path = os.path.abspath(sys.argv[1])
 
     if not os.path.exists(search_path):
         print(f"오류: 경로를 찾을 수 없습니다: {search_path}", flush=True)
@@ -378,24 +1052,37 @@ def main_incremental():
     print(f"검색 경로: {search_path}", flush=True)
     print(f"시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
 
-    # 결과 저장 디렉토리 생성
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    results_dir = Path(__file__).parent / f"results_{timestamp}"
-    results_dir.mkdir(exist_ok=True)
-    print(f"결과 저장 폴더: {results_dir}", flush=True)
+    # 결과 저장 디렉토리 - 중단된 작업이 있으면 이어서, 없으면 새로 생성
+    results_dir, busy = find_resumable_results_dir(search_path)
+    if busy:
+        print(f"오류: 다른 프로세스가 같은 경로를 검사 중입니다: {results_dir}", flush=True)
+        return
+    if results_dir is None:
+        results_dir = create_results_dir(search_path)
+        print(f"결과 저장 폴더: {results_dir}", flush=True)
+    else:
+        print(f"결과 저장 폴더: {results_dir} (중단된 작업 재개)", flush=True)
 
     # 1. 동영상 파일 찾기
     videos = find_video_files(search_path)
 
     if not videos:
         print("동영상 파일을 찾을 수 없습니다.", flush=True)
+        write_summary(results_dir, search_path, 0, 0, [], 0)
         return
 
+    # 이전 스캔의 지문 인덱스 로드 (변경되지 않은 파일은 다시 디코딩하지 않음)
+    # 검색한 경로 아래에서 사라진 파일의 항목은 정리
+    index = load_fingerprint_index()
+    prune_fingerprint_index(index, search_path, videos)
+
     # 2. (폴더, 길이)별로 그룹화
-    duration_groups = group_by_duration_and_folder(videos)
+    duration_groups = group_by_duration_and_folder(videos, index)
+    save_fingerprint_index(index)
 
     if not duration_groups:
         print("중복 후보 파일이 없습니다.", flush=True)
+        write_summary(results_dir, search_path, len(videos), 0, [], 0)
         return
 
     # 폴더별로 그룹 재정리
@@ -404,19 +1091,10 @@ def main_incremental():
         folders_to_process[folder].append((duration, group_videos))
 
     # 이미 처리된 폴더 확인 (재개 기능)
-    completed_folders = set()
-    for existing_file in results_dir.glob("*.json"):
-        if existing_file.name != "summary.json":
-            try:
-                with open(existing_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if 'folder_path' in data:
-                        completed_folders.add(data['folder_path'])
-            except:
-                pass
-
-    if completed_folders:
-        print(f"\n이미 처리된 폴더: {len(completed_folders)}개 (스킵)", flush=True)
+    completed_results = load_folder_results(results_dir)
+
+    if completed_results:
+        print(f"\n이미 처리된 폴더: {len(completed_results)}개 (스킵)", flush=True)
 
     # 3. 폴더별로 처리
     print(f"\n[3단계] 프레임 비교로 중복 확인 중 (폴더별 저장)...", flush=True)
@@ -428,9 +1106,11 @@ def main_incremental():
     for folder_idx, (folder, duration_groups_list) in enumerate(folders_to_process.items(), 1):
         folder_name = os.path.basename(folder) or folder
 
-        # 이미 처리된 폴더는 스킵
-        if folder in completed_folders:
+        # 이미 처리된 폴더는 저장된 결과를 요약에 포함하고 스킵
+        if folder in completed_results:
             print(f"\n[{folder_idx}/{total_folders}] [{folder_name}] - 이미 처리됨, 스킵", flush=True)
+            all_duplicates.extend(completed_results[folder]['duplicates'])
+            total_recoverable += completed_results[folder].get('recoverable_bytes', 0)
             continue
 
         print(f"\n[{folder_idx}/{total_folders}] [{folder_name}] 처리 중...", flush=True)
@@ -443,7 +1123,7 @@ def main_incremental():
             print(f"  - 길이 {duration}초, {len(group_videos)}개 파일 비교 중...", flush=True)
             folder_files_compared += len(group_videos)
 
-            duplicates = find_duplicates_in_group(group_videos)
+            duplicates = find_duplicates_in_group(group_videos, index=index, use_audio=use_audio)
 
             if duplicates:
                 print(f"    -> {len(duplicates)}쌍 중복 발견!", flush=True)
@@ -463,19 +1143,15 @@ def main_incremental():
         all_duplicates.extend(folder_duplicates)
         total_recoverable += folder_recoverable
 
+        # 지문 인덱스 주기적 저장
+        if folder_idx % INDEX_SAVE_INTERVAL == 0:
+            save_fingerprint_index(index)
+
+    save_fingerprint_index(index)
+
     # 4. 전체 요약 파일 저장
-    summary_file = results_dir / "summary.json"
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'search_path': search_path,
-            'scan_time': datetime.now().isoformat(),
-            'total_videos_scanned': len(videos),
-            'total_folders_processed': total_folders,
-            'duplicates_found': len(all_duplicates),
-            'total_recoverable_bytes': total_recoverable,
-            'total_recoverable_formatted': format_size(total_recoverable),
-            'duplicates': all_duplicates
-        }, f, ensure_ascii=False, indent=2)
+    summary_file = write_summary(results_dir, search_path, len(videos), total_folders,
+                                 all_duplicates, total_recoverable)
 
     # 5. 최종 결과 출력
     print("\n" + "=" * 60, flush=True)
@@ -488,6 +1164,260 @@ def main_incremental():
     print(f"\n완료 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
 
 
+def normalize_roots(paths):
+    """검색 경로 정규화 - 중복 경로와 다른 경로 안에 포함된 경로 제거"""
+    roots = sorted({os.path.abspath(p) for p in paths})
+    result = []
+    for root in roots:
+        if not any(is_inside(root, r) for r in result):
+            result.append(root)
+    return result
+
+def get_device_id(path):
+    """경로가 속한 장치(드라이브) 식별자"""
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return path
+
+def scan_roots_by_device(roots, index):
+    """
+    각 검색 경로에서 동영상을 찾고 영상 길이 분석
+    - 다른 장치의 경로는 동시에, 같은 장치의 경로는 순서대로 처리 (장치당 작업자 1개)
+    - 모든 작업자가 하나의 지문 인덱스를 공유
+    - Ctrl+C 또는 작업자 오류 시 모든 작업자를 멈추고 인덱스를 저장한 뒤 예외를 다시 발생
+    반환: {검색경로: {파일경로: 길이}}
+    """
+    device_roots = defaultdict(list)
+    for root in roots:
+        device_roots[get_device_id(root)].append(root)
+
+    root_durations = {}
+    stop = threading.Event()
+
+    def scan_device(dev_roots):
+        for root in dev_roots:
+            videos = find_video_files(root, stop)
+            if stop.is_set():
+                return  # 검색이 끝나지 않았으므로 인덱스를 정리하지 않음
+            prune_fingerprint_index(index, root, videos)
+            durations = {}
+
+            for i, video in enumerate(videos, 1):
+                if stop.is_set():
+                    return
+                if i % 50 == 0:
+                    print(f"  [{root}] 길이 분석: {i}/{len(videos)} ({i*100//len(videos)}%)", flush=True)
+
+                duration = get_cached_duration(video, index)
+                if duration is not None:
+                    durations[str(video)] = duration
+
+            print(f"  [{root}] 길이 분석 완료: {len(durations)}개 파일", flush=True)
+            root_durations[root] = durations
+
+    print(f"\n[1-2단계] {len(roots)}개 경로 검색 및 길이 분석 중 (장치 {len(device_roots)}개 동시 처리)...", flush=True)
+
+    executor = ThreadPoolExecutor(max_workers=len(device_roots))
+    try:
+        pending = {executor.submit(scan_device, dev_roots) for dev_roots in device_roots.values()}
+        last_save = time.monotonic()
+        while pending:
+            # 짧게 나눠 기다려야 Windows에서도 Ctrl+C가 바로 전달됨
+            done, pending = wait(pending, timeout=1)
+            for future in done:
+                future.result()
+
+            # 작업 도중 중단되어도 분석한 길이는 남도록 인덱스 주기적 저장
+            if time.monotonic() - last_save >= INDEX_SAVE_SECONDS:
+                save_fingerprint_index(index)
+                last_save = time.monotonic()
+    except BaseException:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        save_fingerprint_index(index)
+        raise
+
+    executor.shutdown()
+    save_fingerprint_index(index)
+    return root_durations
+
+def get_multi_root_state_file(roots):
+    """
+    여러 경로 검사의 진행 상태 파일 (중단 후 재개용)
+    - 검색 경로 조합마다 따로 두어, 다른 경로들을 검사하는 작업끼리 서로 덮어쓰지 않음
+    """
+    roots_hash = hashlib.sha1("\n".join(sorted(roots)).encode('utf-8')).hexdigest()[:10]
+    return Path(__file__).parent / f"multi_root_state_{roots_hash}.json"
+
+def load_multi_root_state(roots, state_file):
+    """같은 검색 경로로 중단된 작업이 있으면 상태 반환, 없으면 새 상태"""
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('roots') == roots:
+            return state
+    except (OSError, ValueError):
+        pass
+
+    return {
+        'roots': roots,
+        'started': datetime.now().isoformat(),
+        'completed_groups': [],
+        'duplicates': []
+    }
+
+def main_multi_root(use_audio=False):
+    """
+    여러 드라이브를 한 번에 검사하여 드라이브 간 중복을 찾는 버전
+    use_audio: 오디오 지문으로 먼저 걸러내기 (--audio)
+    """
+    roots = normalize_roots(sys.argv[1:])
+
+    # 같은 경로이거나 서로 포함되는 경로는 하나로 합쳐지므로, 하나만 남으면 폴더별 저장 모드로 검사
+    if len(roots) < 2:
+        print(f"검색 경로가 하나로 합쳐졌습니다: {roots[0]} - 폴더별 저장 모드로 검사합니다.", flush=True)
+        main_incremental(roots[0], use_audio)
+        return
+
+    for root in roots:
+        if not os.path.exists(root):
+            print(f"오류: 경로를 찾을 수 없습니다: {root}", flush=True)
+            return
+
+    print("=" * 60, flush=True)
+    print("중복 동영상 탐지 프로그램 (여러 경로 통합 모드)", flush=True)
+    print("=" * 60, flush=True)
+    for root in roots:
+        print(f"검색 경로: {root}", flush=True)
+    print(f"시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
+
+    # 같은 경로 조합을 검사하는 다른 프로세스와 진행 상태 파일을 함께 쓰지 않도록 잠금
+    state_file = get_multi_root_state_file(roots)
+    if not acquire_lock(state_file.with_suffix('.lock')):
+        print(f"오류: 다른 프로세스가 같은 경로들을 검사 중입니다: {state_file.name}", flush=True)
+        return
+
+    state = load_multi_root_state(roots, state_file)
+    if state['completed_groups']:
+        print(f"\n중단된 작업 재개: 비교 완료 그룹 {len(state['completed_groups'])}개, "
+              f"중복 {len(state['duplicates'])}쌍", flush=True)
+
+    # 1-2. 경로별 동영상 검색 + 길이 분석 (인덱스에 있는 파일은 다시 디코딩하지 않음)
+    index = load_fingerprint_index()
+    try:
+        root_durations = scan_roots_by_device(roots, index)
+    except KeyboardInterrupt:
+        print("\n중단되었습니다. 분석한 영상 길이는 지문 인덱스에 저장되었습니다.", flush=True)
+        return
+
+    # 길이별로 전체 경로를 합쳐서 그룹화
+    path_roots = {}
+    duration_groups = defaultdict(list)
+    for root, durations in root_durations.items():
+        for path, duration in durations.items():
+            path_roots[path] = root
+            duration_groups[duration].append(path)
+
+    # 2개 이상의 경로에 걸친 그룹만 비교 (경로 간 중복 후보)
+    cross_groups = {d: v for d, v in duration_groups.items()
+                    if len({path_roots[p] for p in v}) >= 2}
+
+    completed = set(state['completed_groups'])
+    remaining = sorted(d for d in cross_groups if d not in completed)
+    total_candidates = sum(len(v) for v in cross_groups.values())
+    print(f"\n  여러 경로에 걸친 같은 길이 그룹: {len(cross_groups)}개 (총 {total_candidates}개 파일, "
+          f"남은 그룹 {len(remaining)}개)", flush=True)
+
+    # 3. 그룹별 프레임 비교 - 서로 다른 경로의 파일끼리만 비교
+    # (같은 경로 안의 중복은 폴더별 저장 모드가 같은 폴더 기준으로 찾음)
+    print(f"\n[3단계] 프레임 비교로 경로 간 중복 확인 중...", flush=True)
+
+    def is_cross_root(video1, video2):
+        return path_roots[video1] != path_roots[video2]
+
+    try:
+        for group_num, duration in enumerate(remaining, 1):
+            group_videos = cross_groups[duration]
+            print(f"  그룹 {group_num}/{len(remaining)}: 길이 {duration}초, {len(group_videos)}개 파일 비교 중...", flush=True)
+
+            duplicates = find_duplicates_in_group(group_videos, index=index, use_audio=use_audio,
+                                                  can_pair=is_cross_root)
+            for dup in duplicates:
+                dup['original_root'] = path_roots[dup['original']]
+                dup['duplicate_root'] = path_roots[dup['duplicate']]
+
+            if duplicates:
+                print(f"    -> {len(duplicates)}쌍 중복 발견!", flush=True)
+
+            state['duplicates'].extend(duplicates)
+            state['completed_groups'].append(duration)
+
+            # 진행 상태와 지문 인덱스 주기적 저장 (중단 시 마지막 저장 지점부터 재개)
+            if group_num % INDEX_SAVE_INTERVAL == 0:
+                write_json_atomic(state_file, state)
+                save_fingerprint_index(index)
+    except KeyboardInterrupt:
+        write_json_atomic(state_file, state)
+        save_fingerprint_index(index)
+        print(f"\n중단되었습니다. 다시 실행하면 이어서 검사합니다: {state_file}", flush=True)
+        return
+
+    save_fingerprint_index(index)
+
+    # 4. 결과 저장
+    all_duplicates = state['duplicates']
+    total_recoverable = sum(d['duplicate_size'] for d in all_duplicates)
+
+    root_stats = {}
+    for root in roots:
+        durations = root_durations.get(root, {})
+        root_stats[root] = {
+            'videos_scanned': len(durations),
+            'duplicates_as_original': sum(1 for d in all_duplicates if d['original_root'] == root),
+            'duplicates_as_copy': sum(1 for d in all_duplicates if d['duplicate_root'] == root),
+        }
+
+    result_file = Path(__file__).parent / f"duplicate_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    write_json_atomic(result_file, {
+        'search_path': ", ".join(roots),
+        'search_paths': roots,
+        'scan_time': datetime.now().isoformat(),
+        'total_videos_scanned': len(path_roots),
+        'roots': root_stats,
+        'duplicates_found': len(all_duplicates),
+        'total_recoverable_bytes': total_recoverable,
+        'duplicates': all_duplicates
+    }, indent=2)
+
+    # 모든 그룹을 비교했으므로 진행 상태 파일 삭제
+    try:
+        os.remove(state_file)
+    except OSError:
+        pass
+
+    print("\n" + "=" * 60, flush=True)
+    print("검색 완료!", flush=True)
+    print("=" * 60, flush=True)
+    for root, stats in root_stats.items():
+        print(f"  [{root}] 동영상 {stats['videos_scanned']}개, "
+              f"원본 {stats['duplicates_as_original']}개 / 중복본 {stats['duplicates_as_copy']}개", flush=True)
+    print(f"총 {len(all_duplicates)}쌍의 경로 간 중복 동영상 발견", flush=True)
+    print(f"총 절약 가능 용량: {format_size(total_recoverable)}", flush=True)
+    print(f"\n결과가 저장되었습니다: {result_file}", flush=True)
+    print(f"\n완료 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
+
+
 if __name__ == "__main__":
+    # --audio: 오디오 지문 단계 사용 (ffmpeg 필요)
+    use_audio = '--audio' in sys.argv
+    if use_audio:
+        sys.argv.remove('--audio')
+        if not FFMPEG_PATH:
+            print("경고: ffmpeg를 찾을 수 없어 오디오 지문 단계를 건너뜁니다.", flush=True)
+
     # main()  # 기존 버전
-    main_incremental()  # 폴더별 저장 버전
+    if len(sys.argv) > 2:
+        main_multi_root(use_audio)  # 여러 경로(드라이브) 통합 검사
+    else:
+        main_incremental(use_audio=use_audio)  # 폴더별 저장 버전
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+다운로드 폴더 감시 스크립트 (감시 모드)
+- 새로 다운로드가 끝난 동영상만 지문(영상 길이 + 프레임 해시 + 오디오)을 계산
+- 저장된 지문 인덱스(fingerprint_index.db)와 비교하여 중복이면 결과 파일에 추가
+- Linux는 inotify, 그 외 OS는 주기적인 폴더 스캔으로 감시
+
+사용법: python watch_downloads.py [--audio] [감시폴더 ...]
+  --audio: 오디오 지문 단계 사용 (ffmpeg 필요)
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from find_duplicate_videos import (
+    FFMPEG_PATH,
+    VIDEO_EXTENSIONS,
+    build_duration_lookup,
+    find_duplicates_for_video,
+    format_size,
+    get_cached_audio,
+    get_cached_duration,
+    get_cached_hashes,
+    index_key,
+    load_fingerprint_index,
+    prune_fingerprint_index,
+    save_fingerprint_index,
+    write_json_atomic,
+)
+
+# 감시 모드 결과 파일 (delete_duplicates_interactive.py가 읽는 형식과 동일)
+WATCH_RESULT_FILE = Path(__file__).parent / "duplicate_results_watch.json"
+
+SETTLE_SECONDS = 3   # 마지막 이벤트 후 이 시간 동안 변화가 없으면 처리
+POLL_INTERVAL = 10   # inotify를 쓸 수 없을 때 폴더 재스캔 간격(초)
+
+# inotify 이벤트 플래그 (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+def is_video_file(path):
+    return Path(path).suffix.lower() in VIDEO_EXTENSIONS
+
+
+def iter_video_files(root):
+    """root 아래의 모든 동영상 파일 경로"""
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if is_video_file(name):
+                yield os.path.join(dirpath, name)
+
+
+class InotifyWatcher:
+    """Linux inotify로 하위 폴더까지 감시 (외부 패키지 없이 ctypes 사용)"""
+
+    def __init__(self, roots):
+        self.roots = roots
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self.watches = {}  # wd -> 폴더 경로
+        for root in roots:
+            self.add_tree(root)
+
+    def add_tree(self, root):
+        """폴더와 모든 하위 폴더에 감시 추가"""
+        for dirpath, _, _ in os.walk(root):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = dirpath
+
+    def poll(self, timeout):
+        """
+        timeout 초 동안 이벤트 대기
+        반환: 새로 완료된 동영상 경로 리스트
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        data = os.read(self.fd, 64 * 1024)
+        paths = []
+        offset = 0
+
+        while offset < len(data):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_len].rstrip(b'\0'))
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                # 이벤트 유실 - 전체 재확인 (이미 인덱스에 있는 파일은 건너뜀)
+                for root in self.roots:
+                    paths.extend(iter_video_files(root))
+                continue
+
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            folder = self.watches.get(wd)
+            if folder is None or not name:
+                continue
+            path = os.path.join(folder, name)
+
+            if mask & IN_ISDIR:
+                # 새로 생기거나 옮겨진 폴더도 감시하고, 안에 있던 동영상 처리
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path)
+                    paths.extend(iter_video_files(path))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and is_video_file(name):
+                paths.append(path)
+
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """inotify가 없는 OS용 - 주기적으로 폴더를 스캔하여 크기/수정시간이 멈춘 파일을 보고"""
+
+    def __init__(self, roots):
+        self.roots = roots
+        self.snapshot = self.scan()
+
+    def scan(self):
+        state = {}
+        for root in self.roots:
+            for path in iter_video_files(root):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                state[path] = (st.st_size, st.st_mtime)
+        return state
+
+    def poll(self, timeout):
+        time.sleep(max(timeout, POLL_INTERVAL))
+        current = self.scan()
+
+        # 직전 스캔과 크기/수정시간이 같으면 다운로드가 끝난 것으로 간주
+        paths = [p for p, state in current.items() if self.snapshot.get(p) == state]
+        self.snapshot = current
+        return paths
+
+    def close(self):
+        pass
+
+
+def create_watcher(roots):
+    """Linux면 inotify, 아니면 폴링 방식 감시기 생성"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            print(f"  inotify 사용 불가 ({e}) - 폴링 방식으로 감시합니다.", flush=True)
+    return PollingWatcher(roots)
+
+
+def is_already_indexed(index, path):
+    """인덱스에 같은 크기/수정시간의 프레임 해시가 이미 있으면 True"""
+    entry = index.get(index_key(path))
+    if not entry or 'hashes' not in entry:
+        return False
+    try:
+        st = os.stat(path)
+    except OSError:
+        return True  # 이미 사라진 파일은 처리하지 않음
+    return entry.get('size') == st.st_size and entry.get('mtime') == st.st_mtime
+
+
+def append_watch_results(duplicates, result_file=WATCH_RESULT_FILE):
+    """중복 결과를 감시 모드 결과 파일에 추가 (이미 기록된 쌍은 제외)"""
+    try:
+        with open(result_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {'search_path': 'watch', 'duplicates': []}
+
+    known_pairs = {(d['original'], d['duplicate']) for d in data['duplicates']}
+    added = 0
+    for dup in duplicates:
+        pair = (dup['original'], dup['duplicate'])
+        if pair not in known_pairs:
+            known_pairs.add(pair)
+            data['duplicates'].append(dup)
+            added += 1
+
+    data['scan_time'] = datetime.now().isoformat()
+    data['duplicates_found'] = len(data['duplicates'])
+    data['total_recoverable_bytes'] = sum(d['duplicate_size'] for d in data['duplicates'])
+
+    write_json_atomic(result_file, data, indent=2)
+
+    return added
+
+
+def process_new_video(path, index, duration_lookup, use_audio=False):
+    """
+    새 동영상 하나의 지문을 계산하고 인덱스와 비교
+    반환: 인덱스가 갱신되었으면 True
+    """
+    if not os.path.isfile(path) or is_already_indexed(index, path):
+        return False
+
+    name = os.path.basename(path)
+    start = time.perf_counter()
+
+    # 새 파일만 디코딩 (결과는 인덱스에 저장됨)
+    duration = get_cached_duration(path, index)
+    hashes = get_cached_hashes(path, index)
+    audio = get_cached_audio(path, index) if use_audio and FFMPEG_PATH else None
+    fingerprint_time = time.perf_counter() - start
+
+    if not hashes and not audio:
+        print(f"  [{name}] 지문 계산 실패 - 건너뜀", flush=True)
+        return True
+
+    start = time.perf_counter()
+    duplicates = find_duplicates_for_video(path, index, duration_lookup, use_audio=use_audio)
+    match_ms = (time.perf_counter() - start) * 1000
+
+    print(f"  [{name}] 길이 {duration}초, 지문 {fingerprint_time:.1f}초, 비교 {match_ms:.1f}ms", flush=True)
+
+    if duplicates:
+        added = append_watch_results(duplicates)
+        for dup in duplicates:
+            other = dup['original'] if dup['duplicate'] == path else dup['duplicate']
+            print(f"    -> 중복 발견: {other} (유사도 거리: {dup['similarity']}, "
+                  f"절약 가능: {format_size(dup['duplicate_size'])})", flush=True)
+        print(f"    => {added}쌍 추가됨: {WATCH_RESULT_FILE.name}", flush=True)
+
+    return True
+
+
+def main():
+    args = sys.argv[1:]
+    use_audio = '--audio' in args
+    if use_audio:
+        args.remove('--audio')
+        if not FFMPEG_PATH:
+            print("경고: ffmpeg를 찾을 수 없어 오디오 지문 단계를 건너뜁니다.", flush=True)
+
+    roots = args or [str(Path.home() / "Downloads")]
+    roots = [os.path.abspath(r) for r in roots]
+
+    for root in roots:
+        if not os.path.isdir(root):
+            print(f"오류: 경로를 찾을 수 없습니다: {root}", flush=True)
+            return
+
+    print("=" * 60, flush=True)
+    print("중복 동영상 탐지 프로그램 (감시 모드)", flush=True)
+    print("=" * 60, flush=True)
+    for root in roots:
+        print(f"감시 경로: {root}", flush=True)
+    print(f"시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
+
+    index = load_fingerprint_index()
+    duration_lookup = build_duration_lookup(index)
+    print(f"지문 인덱스: {len(index)}개 파일", flush=True)
+
+    watcher = create_watcher(roots)
+
+    # 감시 시작 전에 추가된 파일 따라잡기 (인덱스에 있는 파일은 건너뜀, 사라진 파일의 항목은 정리)
+    print("\n[1단계] 인덱스에 없는 기존 파일 확인 중...", flush=True)
+    for root in roots:
+        found = []
+        for path in iter_video_files(root):
+            found.append(path)
+            process_new_video(path, index, duration_lookup, use_audio)
+        prune_fingerprint_index(index, root, found)
+    save_fingerprint_index(index)
+
+    print("\n[2단계] 새 다운로드 감시 중... (Ctrl+C로 종료)", flush=True)
+
+    pending = {}  # 경로 -> 마지막 이벤트 시각
+    try:
+        while True:
+            for path in watcher.poll(1.0):
+                pending[path] = time.monotonic()
+
+            now = time.monotonic()
+            ready = [p for p, t in pending.items() if now - t >= SETTLE_SECONDS]
+            changed = False
+            for path in ready:
+                del pending[path]
+                changed |= process_new_video(path, index, duration_lookup, use_audio)
+
+            if changed:
+                save_fingerprint_index(index)
+    except KeyboardInterrupt:
+        print("\n감시를 종료합니다.", flush=True)
+    finally:
+        watcher.close()
+        save_fingerprint_index(index)
+
+
+if __name__ == "__main__":
+    main()